@@ -1,12 +1,74 @@
-import requests
 import re
-import json
-from typing import List, Dict, Any
-from datetime import datetime
-from dataclasses import dataclass, asdict
-
-
-@dataclass
+import functools
+import keyword
+import mmap
+import os
+import stat
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Sequence, Callable
+from datetime import date
+from dataclasses import dataclass
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to substring scans
+    ahocorasick = None
+
+try:
+    # RE2's linear-time automata avoid backtracking blowups on the (.+?)
+    # patterns below. Both pyre2 and google-re2 install as "re2" with
+    # different compile() signatures, so patterns are only ever compiled
+    # with inline flags via _compile_pattern.
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# RE2 matches without holding the GIL, so requirement categories can be
+# scanned concurrently; the stdlib matcher holds it and gains nothing, so
+# no pool is created for it
+_ENGINE_RELEASES_GIL = _re_engine is not re
+_POOL = ThreadPoolExecutor(max_workers=3) if _ENGINE_RELEASES_GIL else None
+# Pool dispatch costs tens of microseconds and per-match work still holds
+# the GIL, so only conversations at least this long are scanned concurrently
+_PARALLEL_MIN_CHARS = 256 * 1024
+
+
+_ESCAPE = re.compile(r'\\.')
+_LATIN_LETTER = re.compile(r'[A-Za-z]')
+
+
+def _needs_ignorecase(pattern: str) -> bool:
+    """Whether a pattern has Latin literals; Chinese-only ones gain nothing from case folding"""
+    return _LATIN_LETTER.search(_ESCAPE.sub('', pattern)) is not None
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a multi-line extraction pattern, ignoring case only where it can matter"""
+    flags = '(?im)' if _needs_ignorecase(pattern) else '(?m)'
+    return _re_engine.compile(flags + pattern)
+
+
+_DEFAULT_CONSTRAINTS = (
+    "时间约束：根据项目进度安排",
+    "预算约束：在预算范围内完成",
+    "技术约束：使用现有技术栈"
+)
+
+_DEFAULT_ASSUMPTIONS = (
+    "用户具备基本的计算机使用能力",
+    "系统运行环境稳定",
+    "网络连接正常"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _format_day(day: date) -> str:
+    """Format a creation date, reusing the string for the rest of that day"""
+    return day.strftime("%Y-%m-%d")
+
+
+@dataclass(slots=True)
 class RequirementItem:
     """Data structure for individual requirements"""
     id: str
@@ -17,7 +79,7 @@ class RequirementItem:
     source: str    # Which part of conversation this came from
 
 
-@dataclass
+@dataclass(slots=True)
 class PRDData:
     """Complete PRD data structure"""
     project_name: str
@@ -29,62 +91,89 @@ class PRDData:
     functional_requirements: List[RequirementItem]
     non_functional_requirements: List[RequirementItem]
     technical_requirements: List[RequirementItem]
-    constraints: List[str]
-    assumptions: List[str]
+    constraints: Sequence[str]
+    assumptions: Sequence[str]
 
 
 class ConversationAnalyzer:
     """Analyzes conversation data to extract meaningful information"""
+
+    _PROJECT_NAME_PATTERNS = [
+        _compile_pattern(r'项目(?:名称|叫做|是)(.+?)(?:[。\n]|$)'),
+        _compile_pattern(r'开发(.+?)(?:系统|平台|应用|项目)'),
+        _compile_pattern(r'Project (?:name is )?(.+?)(?:[.。\n]|$)'),
+        _compile_pattern(r'Building (.+?) (?:system|platform|application)')
+    ]
+
+    _SENT_SPLIT = re.compile(r'[。\n.!?]')
+
+    # Most likely hits first (input is mostly Chinese) so the fallback scan exits early
+    _HIGH_PRIORITY_KEYWORDS = ('必须', '关键', '核心', '重要', 'must', 'critical', 'essential', 'key')
+    _MEDIUM_PRIORITY_KEYWORDS = ('需要', '应该', 'should', 'need', 'important')
     
     def __init__(self):
-        self.requirement_patterns = {
+        requirement_patterns = {
             'functional': [
-                r'(?i)用户(?:需要|想要|希望|应该能够)(.+?)(?:[。\n]|$)',
-                r'(?i)系统(?:需要|必须|应该)(.+?)(?:[。\n]|$)',
-                r'(?i)功能(?:包括|需要|要求)(.+?)(?:[。\n]|$)',
-                r'(?i)实现(.+?)功能',
-                r'(?i)I need (.+?)(?:[.。\n]|$)',
-                r'(?i)The system should (.+?)(?:[.。\n]|$)',
-                r'(?i)We need to (.+?)(?:[.。\n]|$)'
+                r'用户(?:需要|想要|希望|应该能够)(.+?)(?:[。\n]|$)',
+                r'系统(?:需要|必须|应该)(.+?)(?:[。\n]|$)',
+                r'功能(?:包括|需要|要求)(.+?)(?:[。\n]|$)',
+                r'实现(.+?)功能',
+                r'I need (.+?)(?:[.。\n]|$)',
+                r'The system should (.+?)(?:[.。\n]|$)',
+                r'We need to (.+?)(?:[.。\n]|$)'
             ],
             'non_functional': [
-                r'(?i)性能(?:要求|需求)(.+?)(?:[。\n]|$)',
-                r'(?i)(?:响应时间|加载时间)(?:需要|应该|不超过)(.+?)(?:[。\n]|$)',
-                r'(?i)(?:并发|用户数)(.+?)(?:[。\n]|$)',
-                r'(?i)(?:安全|权限|认证)(.+?)(?:[。\n]|$)',
-                r'(?i)(?:可用性|稳定性|可靠性)(.+?)(?:[。\n]|$)',
-                r'(?i)Performance (.+?)(?:[.。\n]|$)',
-                r'(?i)Security (.+?)(?:[.。\n]|$)',
-                r'(?i)The system must be (.+?)(?:[.。\n]|$)'
+                r'性能(?:要求|需求)(.+?)(?:[。\n]|$)',
+                r'(?:响应时间|加载时间)(?:需要|应该|不超过)(.+?)(?:[。\n]|$)',
+                r'(?:并发|用户数)(.+?)(?:[。\n]|$)',
+                r'(?:安全|权限|认证)(.+?)(?:[。\n]|$)',
+                r'(?:可用性|稳定性|可靠性)(.+?)(?:[。\n]|$)',
+                r'Performance (.+?)(?:[.。\n]|$)',
+                r'Security (.+?)(?:[.。\n]|$)',
+                r'The system must be (.+?)(?:[.。\n]|$)'
             ],
             'technical': [
-                r'(?i)技术(?:栈|架构|选型)(.+?)(?:[。\n]|$)',
-                r'(?i)使用(.+?)(?:框架|技术|数据库|服务)',
-                r'(?i)(?:API|接口|数据库|服务器)(.+?)(?:[。\n]|$)',
-                r'(?i)(?:部署|环境|平台)(.+?)(?:[。\n]|$)',
-                r'(?i)Using (.+?) framework',
-                r'(?i)Built with (.+?)(?:[.。\n]|$)',
-                r'(?i)Database (.+?)(?:[.。\n]|$)',
-                r'(?i)API (.+?)(?:[.。\n]|$)'
+                r'技术(?:栈|架构|选型)(.+?)(?:[。\n]|$)',
+                r'使用(.+?)(?:框架|技术|数据库|服务)',
+                r'(?:API|接口|数据库|服务器)(.+?)(?:[。\n]|$)',
+                r'(?:部署|环境|平台)(.+?)(?:[。\n]|$)',
+                r'Using (.+?) framework',
+                r'Built with (.+?)(?:[.。\n]|$)',
+                r'Database (.+?)(?:[.。\n]|$)',
+                r'API (.+?)(?:[.。\n]|$)'
             ]
         }
+        self.requirement_patterns = {
+            req_type: [_compile_pattern(p) for p in patterns]
+            for req_type, patterns in requirement_patterns.items()
+        }
         
-        self.objective_patterns = [
-            r'(?i)目标是(.+?)(?:[。\n]|$)',
-            r'(?i)目的是(.+?)(?:[。\n]|$)',
-            r'(?i)希望(?:实现|达到)(.+?)(?:[。\n]|$)',
-            r'(?i)The goal is (.+?)(?:[.。\n]|$)',
-            r'(?i)We want to (.+?)(?:[.。\n]|$)',
-            r'(?i)The objective is (.+?)(?:[.。\n]|$)'
-        ]
+        self.objective_patterns = [_compile_pattern(p) for p in [
+            r'目标是(.+?)(?:[。\n]|$)',
+            r'目的是(.+?)(?:[。\n]|$)',
+            r'希望(?:实现|达到)(.+?)(?:[。\n]|$)',
+            r'The goal is (.+?)(?:[.。\n]|$)',
+            r'We want to (.+?)(?:[.。\n]|$)',
+            r'The objective is (.+?)(?:[.。\n]|$)'
+        ]]
         
-        self.user_patterns = [
-            r'(?i)(?:目标)?用户(?:是|包括|主要是)(.+?)(?:[。\n]|$)',
-            r'(?i)面向(.+?)用户',
-            r'(?i)Target users (.+?)(?:[.。\n]|$)',
-            r'(?i)Users are (.+?)(?:[.。\n]|$)',
-            r'(?i)For (.+?) users'
-        ]
+        self.user_patterns = [_compile_pattern(p) for p in [
+            r'(?:目标)?用户(?:是|包括|主要是)(.+?)(?:[。\n]|$)',
+            r'面向(.+?)用户',
+            r'Target users (.+?)(?:[.。\n]|$)',
+            r'Users are (.+?)(?:[.。\n]|$)',
+            r'For (.+?) users'
+        ]]
+
+        self._prio_ac = None
+        if ahocorasick is not None:
+            self._prio_ac = ahocorasick.Automaton()
+            for keyword in self._MEDIUM_PRIORITY_KEYWORDS:
+                self._prio_ac.add_word(keyword, "Medium")
+            # Added last so a keyword listed at both levels resolves to High
+            for keyword in self._HIGH_PRIORITY_KEYWORDS:
+                self._prio_ac.add_word(keyword, "High")
+            self._prio_ac.make_automaton()
 
     def extract_project_info(self, conversation: str) -> Dict[str, Any]:
         """Extract basic project information"""
@@ -98,15 +187,8 @@ class ConversationAnalyzer:
 
     def _extract_project_name(self, text: str) -> str:
         """Extract project name from conversation"""
-        patterns = [
-            r'(?i)项目(?:名称|叫做|是)(.+?)(?:[。\n]|$)',
-            r'(?i)开发(.+?)(?:系统|平台|应用|项目)',
-            r'(?i)Project (?:name is )?(.+?)(?:[.。\n]|$)',
-            r'(?i)Building (.+?) (?:system|platform|application)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
+        for pattern in self._PROJECT_NAME_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 return matches[0].strip()
         
@@ -114,7 +196,8 @@ class ConversationAnalyzer:
 
     def _extract_overview(self, text: str) -> str:
         """Extract project overview"""
-        sentences = re.split(r'[。\n.!?]', text)
+        # Only the first five sentences are inspected, so stop splitting there
+        sentences = self._SENT_SPLIT.split(text, 5)
         overview_sentences = []
         
         for sentence in sentences[:5]:  # Take first few sentences
@@ -125,72 +208,76 @@ class ConversationAnalyzer:
 
     def _extract_objectives(self, text: str) -> List[str]:
         """Extract project objectives"""
-        objectives = []
-        for pattern in self.objective_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
-            objectives.extend([match.strip() for match in matches])
-        
-        return list(set(objectives))
+        return list({s.strip() for p in self.objective_patterns for s in p.findall(text)})
 
     def _extract_target_users(self, text: str) -> List[str]:
         """Extract target users"""
-        users = []
-        for pattern in self.user_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
-            users.extend([match.strip() for match in matches])
-        
-        return list(set(users))
+        return list({s.strip() for p in self.user_patterns for s in p.findall(text)})
 
     def extract_requirements(self, conversation: str) -> Dict[str, List[RequirementItem]]:
         """Extract requirements from conversation"""
-        requirements = {
-            'functional': [],
-            'non_functional': [],
-            'technical': []
+        if _POOL is not None and len(conversation) >= _PARALLEL_MIN_CHARS:
+            futures = {
+                req_type: _POOL.submit(self._scan_category, req_type, conversation)
+                for req_type in self.requirement_patterns
+            }
+            return {req_type: future.result() for req_type, future in futures.items()}
+
+        return {
+            req_type: self._scan_category(req_type, conversation)
+            for req_type in self.requirement_patterns
         }
-        
-        for req_type, patterns in self.requirement_patterns.items():
-            req_id = 1
-            for pattern in patterns:
-                matches = re.findall(pattern, conversation, re.MULTILINE)
-                for match in matches:
-                    if len(match.strip()) > 5:  # Filter out very short matches
-                        requirement = RequirementItem(
-                            id=f"{req_type[0].upper()}{req_id:03d}",
-                            title=match.strip()[:50] + ("..." if len(match.strip()) > 50 else ""),
-                            description=match.strip(),
-                            priority=self._determine_priority(match),
-                            category=req_type.title(),
-                            source="对话分析"
-                        )
-                        requirements[req_type].append(requirement)
-                        req_id += 1
+
+    def _scan_category(self, req_type: str, conversation: str) -> List[RequirementItem]:
+        """Extract the requirements of a single category"""
+        requirements = []
+        seen = set()
+        req_id = 1
+        for pattern in self.requirement_patterns[req_type]:
+            for match in pattern.findall(conversation):
+                desc = match.strip()
+                dl = len(desc)
+                if dl <= 5:  # Filter out very short matches
+                    continue
+                desc_lower = desc.lower()
+                if desc_lower in seen:  # Same requirement mentioned again
+                    continue
+                seen.add(desc_lower)
+                requirement = RequirementItem(
+                    id=f"{req_type[0].upper()}{req_id:03d}",
+                    title=desc[:50] + ("..." if dl > 50 else ""),
+                    description=desc,
+                    priority=self._determine_priority(desc_lower),
+                    category=req_type.title(),
+                    source="对话分析"
+                )
+                requirements.append(requirement)
+                req_id += 1
         
         return requirements
 
-    def _determine_priority(self, text: str) -> str:
-        """Determine requirement priority based on keywords"""
-        high_priority_keywords = ['必须', '关键', '重要', '核心', 'critical', 'must', 'essential', 'key']
-        medium_priority_keywords = ['应该', '需要', 'should', 'need', 'important']
-        
-        text_lower = text.lower()
-        
-        for keyword in high_priority_keywords:
+    def _determine_priority(self, text_lower: str) -> str:
+        """Determine requirement priority from already-lowercased text"""
+        if self._prio_ac is not None:
+            saw_medium = False
+            for _, priority in self._prio_ac.iter(text_lower):
+                if priority == "High":
+                    return "High"
+                saw_medium = True
+            return "Medium" if saw_medium else "Low"
+
+        for keyword in self._HIGH_PRIORITY_KEYWORDS:
             if keyword in text_lower:
                 return "High"
         
-        for keyword in medium_priority_keywords:
+        for keyword in self._MEDIUM_PRIORITY_KEYWORDS:
             if keyword in text_lower:
                 return "Medium"
         
         return "Low"
 
 
-class PRDGenerator:
-    """Generates PRD documents from analyzed conversation data"""
-    
-    def __init__(self):
-        self.template = """
+_PRD_TEMPLATE = """
 # 产品需求文档 (PRD)
 
 ## 基本信息
@@ -237,40 +324,68 @@ class PRDGenerator:
 *此文档由AI自动生成，请人工审核并完善*
 """
 
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """Specialize a str.format template into a function returning one f-string"""
+    parts = []
+    fields = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is None:
+            continue
+        if spec or conversion or not field.isidentifier() or keyword.iskeyword(field):
+            raise ValueError(f"Unsupported template field: {field!r}")
+        if field not in fields:
+            fields.append(field)
+        parts.append(f'{{{field}}}')
+    
+    # An f-string formats each value with format(), as str.format does, so
+    # non-str arguments are still accepted
+    src = f"def _render({', '.join(fields)}):\n    return f{''.join(parts)!r}\n"
+    namespace = {}
+    exec(compile(src, '<prd_template>', 'exec'), namespace)
+    return namespace['_render']
+
+
+def _format_list(items: Sequence[str], prefix: str = "- ") -> str:
+    """Render items as a markdown bullet list"""
+    return '\n'.join(f"{prefix}{item}" for item in items) if items else "暂无"
+
+
+def _format_requirements(requirements: List[RequirementItem]) -> str:
+    """Render requirements as markdown subsections"""
+    if not requirements:
+        return "暂无"
+    
+    return '\n'.join(
+        f"\n### {req.id}: {req.title}\n"
+        f"- **描述**: {req.description}\n"
+        f"- **优先级**: {req.priority}\n"
+        f"- **来源**: {req.source}\n"
+        for req in requirements
+    )
+
+
+class PRDGenerator:
+    """Generates PRD documents from analyzed conversation data"""
+
+    # Compiled once on class creation; avoids str.format re-parsing the template per call
+    _render = staticmethod(_compile_template(_PRD_TEMPLATE))
+
     def generate_prd(self, prd_data: PRDData) -> str:
         """Generate formatted PRD document"""
-        
-        def format_list(items: List[str], prefix: str = "- ") -> str:
-            if not items:
-                return "暂无"
-            return '\n'.join([f"{prefix}{item}" for item in items])
-        
-        def format_requirements(requirements: List[RequirementItem]) -> str:
-            if not requirements:
-                return "暂无"
-            
-            formatted = []
-            for req in requirements:
-                formatted.append(f"""
-### {req.id}: {req.title}
-- **描述**: {req.description}
-- **优先级**: {req.priority}
-- **来源**: {req.source}
-""")
-            return '\n'.join(formatted)
-        
-        return self.template.format(
+        return self._render(
             project_name=prd_data.project_name,
             version=prd_data.version,
             creation_date=prd_data.creation_date,
             overview=prd_data.overview or "待补充产品概述",
-            objectives=format_list(prd_data.objectives),
-            target_users=format_list(prd_data.target_users),
-            functional_requirements=format_requirements(prd_data.functional_requirements),
-            non_functional_requirements=format_requirements(prd_data.non_functional_requirements),
-            technical_requirements=format_requirements(prd_data.technical_requirements),
-            constraints=format_list(prd_data.constraints),
-            assumptions=format_list(prd_data.assumptions)
+            objectives=_format_list(prd_data.objectives),
+            target_users=_format_list(prd_data.target_users),
+            functional_requirements=_format_requirements(prd_data.functional_requirements),
+            non_functional_requirements=_format_requirements(prd_data.non_functional_requirements),
+            technical_requirements=_format_requirements(prd_data.technical_requirements),
+            constraints=_format_list(prd_data.constraints),
+            assumptions=_format_list(prd_data.assumptions)
         )
 
 
@@ -298,23 +413,15 @@ class ConversationToPRD:
         prd_data = PRDData(
             project_name=project_info['project_name'],
             version="v1.0",
-            creation_date=datetime.now().strftime("%Y-%m-%d"),
+            creation_date=_format_day(date.today()),
             overview=project_info['overview'],
             objectives=project_info['objectives'],
             target_users=project_info['target_users'],
             functional_requirements=requirements['functional'],
             non_functional_requirements=requirements['non_functional'],
             technical_requirements=requirements['technical'],
-            constraints=[
-                "时间约束：根据项目进度安排",
-                "预算约束：在预算范围内完成",
-                "技术约束：使用现有技术栈"
-            ],
-            assumptions=[
-                "用户具备基本的计算机使用能力",
-                "系统运行环境稳定",
-                "网络连接正常"
-            ]
+            constraints=_DEFAULT_CONSTRAINTS,
+            assumptions=_DEFAULT_ASSUMPTIONS
         )
         
         # Generate PRD document
@@ -323,8 +430,18 @@ class ConversationToPRD:
     def process_from_file(self, file_path: str, project_name: str = None) -> str:
         """Process conversation from file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                conversation_text = file.read()
+            with open(file_path, 'rb') as file:
+                st = os.fstat(file.fileno())
+                # Only non-empty regular files can be mapped; pipes, FIFOs and
+                # /proc files report size 0 but still have content to read
+                if stat.S_ISREG(st.st_mode) and st.st_size > 0:
+                    # Decode straight from the mapping to skip an intermediate bytes copy
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        conversation_text = str(mm, 'utf-8', 'replace')
+                else:
+                    conversation_text = file.read().decode('utf-8', 'replace')
+            if '\r' in conversation_text:  # Same newline handling as text-mode open()
+                conversation_text = conversation_text.replace('\r\n', '\n').replace('\r', '\n')
             return self.process_conversation(conversation_text, project_name)
         except FileNotFoundError:
             return "错误：找不到指定的文件"